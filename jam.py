@@ -1,18 +1,25 @@
 ########################################################################################################################
 # Jackbox Audience Maker
-# Version 2024.08.03
+# Version 2024.08.04
 ########################################################################################################################
 # Copyright (c) 2024 Orobas
 # https://www.orobas.com.au
 
 
 from asyncio import run as async_run
+from os import remove as os_remove
 from sys import argv as system_arguments
+from system.host import Host
 from system.terminal import Terminal
+from time import monotonic, strftime
+from web.profile import Profile
+from web.viewer import Viewer
 from web.viewers import Viewers
 
 
 __CODE_LENGTH = 4
+__SESSION_FILE = "session.json"
+__STATUSES = (Viewer.STATUS_JOINED, Viewer.STATUS_PENDING, Viewer.STATUS_FAILED, Viewer.STATUS_RETRIED)
 
 if __name__ == "__main__":
     terminal = Terminal()
@@ -20,23 +27,102 @@ if __name__ == "__main__":
     terminal.write("Jackbox Audience Maker")
     terminal.fill("*")
 
-    if len(system_arguments) == 3:
+    host = Host()
+    arguments = []
+    options = {}
+    room = None
+    fill = None
+    profile = None
+    url = None
+
+    for argument in system_arguments[1:]:
+        if argument.startswith("--") and "=" in argument:
+            key, value = argument[2:].split("=", 1)
+            options[key] = value
+        else:
+            arguments.append(argument)
+
+    try:
+        Viewer.isolate(
+            cpus=Host.parse_cpus(options["cpus"]) if "cpus" in options else None,
+            priority=int(options["priority"]) if "priority" in options else None,
+            renderers=int(options["renderers"]) if "renderers" in options else None
+        )
+        viewers = Viewers(
+            terminal.update,
+            floor=float(options["floor"]) if "floor" in options else None,
+            ceiling=float(options["ceiling"]) if "ceiling" in options else None
+        )
+    except (RuntimeError, ValueError) as error:
+        terminal.write(f"Invalid option: {error}")
+        raise SystemExit(1)
+
+    if len(arguments) in (2, 3):
         try:
-            room = system_arguments[1]
-            fill = int(system_arguments[2])
+            room = arguments[0]
 
-            if len(room) != __CODE_LENGTH or fill < 1:
+            if ":" in arguments[1]:
+                profile = Profile.parse(arguments[1])
+            else:
+                fill = int(arguments[1])
+
+            if len(arguments) == 3:
+                url = arguments[2]
+
+            if len(room) != __CODE_LENGTH or (fill is not None and fill < 1):
                 room = None
                 fill = None
+                profile = None
 
         except ValueError:
             room = None
             fill = None
-    else:
-        room = None
-        fill = None
+            profile = None
+
+    if room and profile:
+        terminal.write(f"Room Code: {room}")
+        terminal.write(f"Load Profile: {arguments[1]}")
+
+        terminal.start_dashboard(*__STATUSES, rate=Viewer.STATUS_JOINED)
+
+        try:
+            async_run(viewers.profile(room, profile, url))
+        finally:
+            terminal.stop_dashboard()
+            viewers.close()
+
+        report = profile.report()
+        file = f"profile-{room}-{strftime('%Y%m%d-%H%M%S')}.txt"
 
-    if not room or not fill:
+        with open(file, "w") as output:
+            output.write(report + "\n")
+
+        terminal.fill("-")
+        terminal.write(report)
+        terminal.fill("-")
+        terminal.write(f"Report: {file}")
+        raise SystemExit(0)
+
+    session = None if profile else Viewers.load(__SESSION_FILE)
+
+    if session and room and room != session[Viewers.SESSION_ROOM]:
+        session = None
+
+    if session:
+        choice = terminal.get_choice(
+            "Previous Session",
+            ("r", f"Restore {len(session[Viewers.SESSION_VIEWERS])} viewers in room {session[Viewers.SESSION_ROOM]}"),
+            ("n", "Start a new audience"),
+            default="r"
+        )
+
+        if choice.lower() != "r":
+            session = None
+
+    if session:
+        terminal.write(f"Room Code: {session[Viewers.SESSION_ROOM]}")
+        terminal.write(f"Audience Number: {len(session[Viewers.SESSION_VIEWERS])}")
+    elif not room or not fill:
         room = terminal.get_string(
             "Room Code",
             minimum_length=__CODE_LENGTH,
@@ -47,6 +133,34 @@ if __name__ == "__main__":
         terminal.write(f"Room Code: {room}")
         terminal.write(f"Audience Number: {fill}")
 
-    viewers = async_run(Viewers().build(room, fill))
+    sample = host.sample()
+    started = monotonic()
+    terminal.start_dashboard(*__STATUSES, rate=Viewer.STATUS_JOINED)
+
+    try:
+        if session:
+            async_run(viewers.restore(session))
+        else:
+            async_run(viewers.build(room, fill, url))
+    finally:
+        terminal.stop_dashboard()
+
+    elapsed = monotonic() - started
+    usage = host.usage(sample)
+    viewers.save(__SESSION_FILE)
+    terminal.write(f"{'Restored' if session else 'Filled'} in {elapsed:.1f} seconds")
+
+    if usage:
+        terminal.write("Core Usage: " + ", ".join(f"{core}: {busy:.0%}" for core, busy in enumerate(usage)))
+
+    before = async_run(viewers.measure())
+    after = async_run(viewers.park().measure())
+
+    if before and after:
+        terminal.write(f"Joined: {before['rss']:.0f} MB resident, {before['cpu']:.2f} CPU cores")
+        terminal.write(f"Parked: {after['rss']:.0f} MB resident, {after['cpu']:.2f} CPU cores")
+
+    viewers.autosave(__SESSION_FILE)
     terminal.wait()
     viewers.close()
+    os_remove(__SESSION_FILE)
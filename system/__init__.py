@@ -1,11 +1,12 @@
 ########################################################################################################################
 # Jackbox Audience Maker > System
-# Version 2024.08.02
+# Version 2024.08.04
 ########################################################################################################################
 # Copyright (c) 2024 Orobas
 # https://www.orobas.com.au
 
 
 __all__ = [
+    "host",
     "terminal",
 ]
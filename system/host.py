@@ -0,0 +1,352 @@
+########################################################################################################################
+# Jackbox Audience Maker > System > Host
+# Version 2024.08.04
+########################################################################################################################
+# Copyright (c) 2024 Orobas
+# https://www.orobas.com.au
+
+
+from os import cpu_count, listdir
+from os.path import join as path_join
+from typing import Iterable, List, Optional, Set, Tuple
+
+try:
+    from os import getloadavg, sysconf
+except ImportError:
+    getloadavg = None
+    sysconf = None
+
+try:
+    from os import PRIO_PROCESS, getpriority, sched_getaffinity, sched_setaffinity, setpriority
+except ImportError:
+    PRIO_PROCESS = None
+    getpriority = None
+    sched_getaffinity = None
+    sched_setaffinity = None
+    setpriority = None
+
+
+class Host:
+    """
+    Host resource helper.
+    """
+
+    # region Properties
+
+    @property
+    def cores(self) -> int:
+        """
+        Gets the number of logical processors on the host.
+        :return: The number of logical processors on the host.
+        """
+
+        return cpu_count() or 1
+
+    @property
+    def isolation(self) -> bool:
+        """
+        Determines whether processes can be restricted to processors and reprioritised on the host.
+        :return: True if processes can be isolated; otherwise, false.
+        """
+
+        return bool(getpriority and sched_getaffinity and sched_setaffinity and setpriority)
+
+    @property
+    def load(self) -> Optional[float]:
+        """
+        Gets the one minute load average of the host.
+        :return: The one minute load average of the host, or none if it is not available.
+        """
+
+        if not getloadavg:
+            return None
+
+        try:
+            return getloadavg()[0]
+        except OSError:
+            return None
+
+    @property
+    def memory_available(self) -> Optional[int]:
+        """
+        Gets the amount of physical memory available on the host.
+        :return: The amount of physical memory available, in bytes, or none if it is not available.
+        """
+
+        if not sysconf:
+            return None
+
+        try:
+            return sysconf(Host.__PAGES_AVAILABLE) * sysconf(Host.__PAGE_SIZE)
+        except (OSError, ValueError):
+            return None
+
+    @property
+    def priority(self) -> Optional[int]:
+        """
+        Gets the niceness of the current process, below which it cannot reprioritise processes without privileges.
+        :return: The niceness of the current process, or none if not available.
+        """
+
+        if not getpriority:
+            return None
+
+        return getpriority(PRIO_PROCESS, 0)
+
+    @property
+    def processors(self) -> Optional[Set[int]]:
+        """
+        Gets the processors on which the current process may run.
+        :return: The processors on which the current process may run, or none if not available.
+        """
+
+        if not sched_getaffinity:
+            return None
+
+        return set(sched_getaffinity(0))
+
+    # endregion
+
+    # region Methods
+
+    def isolate(self, pid: int, cpus: Optional[Iterable[int]] = None, priority: Optional[int] = None) -> int:
+        """
+        Restrict a process tree to a set of processors and lower its scheduling priority on Linux.
+        Processes started by the tree afterwards inherit the restrictions.
+        :param pid: Identifier of the root process.
+        :param cpus: Processors on which the tree may run, defaults to no restriction.
+        :param priority: Niceness to apply to the tree, defaults to no change.
+        :return: The number of processes that were restricted.
+        :raises OSError: If a process could not be restricted, such as for an invalid processor or missing permission.
+        """
+
+        if not self.isolation:
+            return 0
+
+        cpus = set(cpus) if cpus else None
+        count = 0
+
+        for process in self.__tree__(pid):
+            try:
+                for thread in listdir(path_join(Host.__PROC, str(process), Host.__PROC_TASK)):
+                    if cpus:
+                        sched_setaffinity(int(thread), cpus)
+
+                    if priority is not None:
+                        setpriority(PRIO_PROCESS, int(thread), priority)
+
+                count += 1
+            except (FileNotFoundError, ProcessLookupError):
+                continue
+
+        return count
+
+    @staticmethod
+    def parse_cpus(value: str) -> Set[int]:
+        """
+        Parse a processor list such as 2-5,8 into a set of processor numbers.
+        :param value: Processor list.
+        :return: The set of processor numbers.
+        :raises ValueError: If the processor list is not valid.
+        """
+
+        cpus = set()
+
+        for entry in value.split(","):
+            bounds = entry.strip().split("-")
+
+            if len(bounds) == 1:
+                cpus.add(int(bounds[0]))
+            elif len(bounds) == 2 and int(bounds[0]) <= int(bounds[1]):
+                cpus.update(range(int(bounds[0]), int(bounds[1]) + 1))
+            else:
+                raise ValueError(f"Processor list entry '{entry.strip()}' is not valid.")
+
+        if any(cpu < 0 for cpu in cpus):
+            raise ValueError("Processor numbers cannot be negative.")
+
+        return cpus
+
+    def resources(self, pid: int) -> Optional[Tuple[int, float]]:
+        """
+        Gets the resident memory and processor time of a process and all of its descendants on Linux.
+        :param pid: Identifier of the root process.
+        :return: The resident memory, in bytes, and processor time, in seconds, or none if not available.
+        """
+
+        if not sysconf:
+            return None
+
+        try:
+            ticks = sysconf(Host.__CLOCK_TICKS)
+        except (OSError, ValueError):
+            return None
+
+        memory = 0
+        time = 0
+
+        for process in self.__tree__(pid):
+            directory = path_join(Host.__PROC, str(process))
+
+            try:
+                with open(path_join(directory, Host.__PROC_STATUS)) as file:
+                    for line in file:
+                        if line.startswith(Host.__STATUS_RSS):
+                            memory += int(line.split()[1]) * Host.__KILOBYTE
+                            break
+
+                with open(path_join(directory, Host.__PROC_STAT)) as file:
+                    fields = file.read().rsplit(")", 1)[1].split()
+                    time += int(fields[Host.__STAT_UTIME]) + int(fields[Host.__STAT_STIME])
+            except (OSError, IndexError, ValueError):
+                continue
+
+        if memory == 0 and time == 0:
+            return None
+
+        return memory, time / ticks
+
+    # noinspection PyMethodMayBeStatic
+    def sample(self) -> List[Tuple[int, int]]:
+        """
+        Sample the busy and total processor time of each processor on Linux.
+        :return: List of busy and total processor time pairs, in clock ticks, or an empty list if not available.
+        """
+
+        samples = []
+
+        try:
+            with open(path_join(Host.__PROC, Host.__PROC_STAT)) as file:
+                for line in file:
+                    fields = line.split()
+
+                    if not fields[0].startswith("cpu") or fields[0] == "cpu":
+                        continue
+
+                    times = [int(field) for field in fields[1:Host.__STAT_GUEST + 1]]
+                    idle = sum(times[Host.__STAT_IDLE:Host.__STAT_IOWAIT + 1])
+                    samples.append((sum(times) - idle, sum(times)))
+        except OSError:
+            return []
+
+        return samples
+
+    def __tree__(self, pid: int) -> List[int]:
+        """
+        Gets the identifiers of a process and all of its descendants on Linux.
+        :param pid: Identifier of the root process.
+        :return: The identifiers of the process and all of its descendants.
+        """
+
+        tree = [pid]
+        index = 0
+
+        while index < len(tree):
+            directory = path_join(Host.__PROC, str(tree[index]), Host.__PROC_TASK)
+
+            try:
+                for thread in listdir(directory):
+                    with open(path_join(directory, thread, Host.__PROC_CHILDREN)) as file:
+                        tree.extend(int(child) for child in file.read().split())
+            except OSError:
+                pass
+
+            index += 1
+
+        return tree
+
+    def usage(self, sample: List[Tuple[int, int]]) -> List[float]:
+        """
+        Gets the fraction of time each processor was busy since an earlier sample.
+        :param sample: Earlier sample.
+        :return: List of busy fractions, one per processor, or an empty list if not available.
+        """
+
+        usage = []
+
+        for (busy_before, total_before), (busy_after, total_after) in zip(sample, self.sample()):
+            total = total_after - total_before
+            usage.append((busy_after - busy_before) / total if total > 0 else 0.0)
+
+        return usage
+
+    # endregion
+
+    # region Constants
+
+    __CLOCK_TICKS = "SC_CLK_TCK"
+    """
+    System configuration name for the number of clock ticks per second.
+    """
+
+    __KILOBYTE = 1024
+    """
+    Number of bytes in a kilobyte.
+    """
+
+    __PAGE_SIZE = "SC_PAGE_SIZE"
+    """
+    System configuration name for the size of a memory page.
+    """
+
+    __PAGES_AVAILABLE = "SC_AVPHYS_PAGES"
+    """
+    System configuration name for the number of available memory pages.
+    """
+
+    __PROC = "/proc"
+    """
+    Path to the Linux process information directory.
+    """
+
+    __PROC_CHILDREN = "children"
+    """
+    Name of the Linux process information file that lists the children of a thread.
+    """
+
+    __PROC_STAT = "stat"
+    """
+    Name of the Linux process information file that holds the processor times.
+    """
+
+    __PROC_STATUS = "status"
+    """
+    Name of the Linux process information file that holds the memory usage of a process.
+    """
+
+    __PROC_TASK = "task"
+    """
+    Name of the Linux process information directory that lists the threads of a process.
+    """
+
+    __STAT_GUEST = 8
+    """
+    Index of the guest time in a processor line of the Linux processor times, already counted in the user time.
+    """
+
+    __STAT_IDLE = 3
+    """
+    Index of the idle time in a processor line of the Linux processor times.
+    """
+
+    __STAT_IOWAIT = 4
+    """
+    Index of the I/O wait time in a processor line of the Linux processor times.
+    """
+
+    __STAT_STIME = 12
+    """
+    Index of the system time in the fields after the command name of the Linux process status.
+    """
+
+    __STAT_UTIME = 11
+    """
+    Index of the user time in the fields after the command name of the Linux process status.
+    """
+
+    __STATUS_RSS = "VmRSS:"
+    """
+    Label of the resident memory line in the Linux process memory usage.
+    """
+
+    # endregion
@@ -1,22 +1,80 @@
 ########################################################################################################################
 # Jackbox Audience Maker > System > Terminal
-# Version 2024.08.02
+# Version 2024.08.04
 ########################################################################################################################
 # Copyright (c) 2024 Orobas
 # https://www.orobas.com.au
 
 
-from os import get_terminal_size
+from .host import Host
+from collections import deque
+from os import get_terminal_size, name as os_name
+from sys import stdout
+from threading import Event, Lock, Thread
+from time import monotonic
 from typing import Any, Tuple
 
+try:
+    from ctypes import byref, c_ulong, windll
+except ImportError:
+    byref = None
+    c_ulong = None
+    windll = None
+
 
 class Terminal:
     """
     Terminal helper.
     """
 
+    # region Constructors
+
+    def __init__(self) -> None:
+        """
+        Create a new terminal helper.
+        """
+
+        self.__counts = {}
+        self.__dashboard = False
+        self.__drawn = 0
+        self.__history = deque()
+        self.__host = Host()
+        self.__labels = ()
+        self.__live = False
+        self.__lock = Lock()
+        self.__rate = None
+        self.__stop = Event()
+        self.__thread = None
+
+    # endregion
+
     # region Properties
 
+    @property
+    def __ansi__(self) -> bool:
+        """
+        Gets whether the terminal interprets ANSI escape sequences, enabling them on Windows consoles if needed.
+        :return: True if the terminal interprets ANSI escape sequences; otherwise, false.
+        """
+
+        if not stdout or not stdout.isatty():
+            return False
+
+        if os_name != "nt":
+            return True
+
+        if not windll:
+            return False
+
+        kernel = windll.kernel32
+        handle = kernel.GetStdHandle(Terminal.__CONSOLE_OUTPUT)
+        mode = c_ulong()
+
+        if not kernel.GetConsoleMode(handle, byref(mode)):
+            return False
+
+        return bool(kernel.SetConsoleMode(handle, mode.value | Terminal.__CONSOLE_VIRTUAL))
+
     @property
     def height(self) -> int:
         """
@@ -53,6 +111,41 @@ class Terminal:
         for _ in range(self.height):
             print()
 
+    def __draw__(self) -> None:
+        """
+        Redraw the dashboard region in place, or write it once as plain lines if the terminal is not live.
+        """
+
+        with self.__lock:
+            counts = dict(self.__counts)
+
+        now = monotonic()
+        lines = [f"{label.title()}: {counts.get(label, 0)}" for label in self.__labels]
+
+        if self.__rate:
+            self.__history.append((now, counts.get(self.__rate, 0)))
+
+            while self.__live and len(self.__history) > 1 and now - self.__history[0][0] > Terminal.__DASHBOARD_WINDOW:
+                self.__history.popleft()
+
+            elapsed = now - self.__history[0][0]
+            rate = (self.__history[-1][1] - self.__history[0][1]) / elapsed if elapsed > 0 else 0.0
+            lines.append(f"{self.__rate.title()} Rate: {rate:.1f}/s")
+
+        memory = self.__host.memory_available
+        lines.append(f"Memory Available: {'n/a' if memory is None else f'{memory / Terminal.__MEGABYTE:.0f} MB'}")
+
+        if self.__live:
+            width = self.width
+            output = f"\x1b[{self.__drawn}F" if self.__drawn else ""
+            output += "".join(f"\x1b[2K{line[:width]}\n" for line in lines)
+            self.__drawn = len(lines)
+        else:
+            output = "".join(f"{line}\n" for line in lines)
+
+        stdout.write(output)
+        stdout.flush()
+
     def fill(self, content: str) -> None:
         """
         Fill a row with the specified content.
@@ -63,12 +156,8 @@ class Terminal:
         if not content:
             raise ValueError("The content is blank.")
 
-        value = ""
-
-        while len(value) < self.width:
-            value += content
-
-        print(value[:self.width])
+        width = self.width
+        print((content * (width // len(content) + 1))[:width])
 
     def get_choice(self, prompt: str, *args: Tuple[str, str], **kwargs: Any) -> str:
         """
@@ -204,6 +293,76 @@ class Terminal:
             if response or not required:
                 return response
 
+    def start_dashboard(self, *args: str, **kwargs: Any) -> None:
+        """
+        Start redrawing a live status dashboard in place at a capped refresh rate.
+        Nothing else should be written to the terminal until the dashboard is stopped.
+        If the terminal does not interpret ANSI escape sequences, the final counts are only written once when stopped.
+        :param args: Labels of the counts to display.
+        :param kwargs: Keyword arguments.
+        :keyword rate: str, Label of the count whose rate per second is displayed, defaults to none.
+        :keyword interval: float, Minimum amount of time, in seconds, between redraws, defaults to a quarter second.
+        :raises RuntimeError: If the dashboard has already been started.
+        :raises ValueError: If there are no labels provided.
+        """
+
+        if self.__dashboard:
+            raise RuntimeError("Dashboard has already been started.")
+
+        if len(args) == 0:
+            raise ValueError("No labels provided.")
+
+        interval = kwargs.get("interval", Terminal.__DASHBOARD_INTERVAL)
+
+        with self.__lock:
+            self.__counts = {label: 0 for label in args}
+
+        self.__dashboard = True
+        self.__drawn = 0
+        self.__history.clear()
+        self.__labels = args
+        self.__live = self.__ansi__
+        self.__rate = kwargs.get("rate", None)
+        self.__stop.clear()
+
+        if not self.__live:
+            self.__history.append((monotonic(), 0))
+            return
+
+        def redraw() -> None:
+            while not self.__stop.wait(interval):
+                self.__draw__()
+
+        self.__draw__()
+        self.__thread = Thread(target=redraw, daemon=True)
+        self.__thread.start()
+
+    def stop_dashboard(self) -> None:
+        """
+        Stop redrawing the live status dashboard, leaving its final state displayed.
+        """
+
+        if not self.__dashboard:
+            return
+
+        if self.__thread:
+            self.__stop.set()
+            self.__thread.join()
+            self.__thread = None
+
+        self.__dashboard = False
+        self.__draw__()
+
+    def update(self, label: str, delta: int = 1) -> None:
+        """
+        Update a dashboard count without redrawing.
+        :param label: Label of the count.
+        :param delta: Amount by which to change the count.
+        """
+
+        with self.__lock:
+            self.__counts[label] = self.__counts.get(label, 0) + delta
+
     # noinspection PyMethodMayBeStatic
     def wait(self, message: str = "Press Enter to continue...") -> None:
         """
@@ -232,6 +391,26 @@ class Terminal:
 
     # region Constants
 
+    __CONSOLE_OUTPUT = -11
+    """
+    Windows console standard output handle identifier.
+    """
+
+    __CONSOLE_VIRTUAL = 0x0004
+    """
+    Windows console mode flag that enables the processing of ANSI escape sequences.
+    """
+
+    __DASHBOARD_INTERVAL = 0.25
+    """
+    Default minimum amount of time, in seconds, between dashboard redraws.
+    """
+
+    __DASHBOARD_WINDOW = 5.0
+    """
+    Amount of time, in seconds, over which the dashboard rate is averaged.
+    """
+
     __DEFAULT_HEIGHT = 24
     """
     Default height of the terminal.
@@ -242,4 +421,9 @@ class Terminal:
     Default width of the terminal.
     """
 
+    __MEGABYTE = 1024 * 1024
+    """
+    Number of bytes in a megabyte.
+    """
+
     # endregion
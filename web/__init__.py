@@ -1,12 +1,15 @@
 ########################################################################################################################
 # Jackbox Audience Maker > Web
-# Version 2024.08.02
+# Version 2024.08.04
 ########################################################################################################################
 # Copyright (c) 2024 Orobas
 # https://www.orobas.com.au
 
 
 __all__ = [
+    "latency",
+    "profile",
+    "stage",
     "viewer",
     "viewers",
 ]
@@ -0,0 +1,183 @@
+########################################################################################################################
+# Jackbox Audience Maker > Web > Latency
+# Version 2024.08.04
+########################################################################################################################
+# Copyright (c) 2024 Orobas
+# https://www.orobas.com.au
+
+
+from bisect import insort
+from collections import deque
+from math import ceil
+from threading import Lock
+from typing import Any, Optional
+
+
+class Latency:
+    """
+    Join latency tracker that derives wait deadlines from the percentiles of successful latencies.
+    Timeouts are tracked separately and only widen a deadline by a bounded step.
+    It may be shared by viewers joining from several threads.
+    """
+
+    # region Constructors
+
+    def __init__(self, **kwargs: Any) -> None:
+        """
+        Create a new join latency tracker.
+        :param kwargs: Keyword arguments.
+        :keyword floor: float, Shortest wait deadline, in seconds, defaults to two seconds.
+        :keyword ceiling: float, Longest wait deadline, in seconds, defaults to thirty seconds.
+        :keyword initial: float, Wait deadline, in seconds, until enough latencies are recorded, defaults to ten.
+        :keyword percentile: float, Percentile, as a fraction, from which deadlines are derived, defaults to 0.95.
+        :keyword factor: float, Multiple of the percentile latency allowed before a wait fails, defaults to two.
+        :raises ValueError: If any of the settings are not valid.
+        """
+
+        self.__floor = float(kwargs.get("floor", Latency.__DEFAULT_FLOOR))
+        self.__ceiling = float(kwargs.get("ceiling", Latency.__DEFAULT_CEILING))
+        self.__initial = float(kwargs.get("initial", Latency.__DEFAULT_INITIAL))
+        self.__percentile = float(kwargs.get("percentile", Latency.__DEFAULT_PERCENTILE))
+        self.__factor = float(kwargs.get("factor", Latency.__DEFAULT_FACTOR))
+
+        if self.__floor <= 0 or self.__floor > self.__ceiling:
+            raise ValueError("Floor is not positive or is greater than the ceiling.")
+
+        if not 0 < self.__percentile <= 1:
+            raise ValueError("Percentile is not between zero and one.")
+
+        if self.__factor < 1:
+            raise ValueError("Factor is less than one.")
+
+        self.__lock = Lock()
+        self.__outcomes = {}
+        self.__recent = {}
+        self.__sorted = {}
+
+    # endregion
+
+    # region Methods
+
+    def expire(self, phase: str) -> None:
+        """
+        Record a join phase that reached its deadline without completing.
+        :param phase: Join phase.
+        """
+
+        with self.__lock:
+            self.__outcomes.setdefault(phase, deque(maxlen=Latency.__SAMPLES_MAXIMUM)).append(True)
+
+    def percentile(self, phase: str) -> Optional[float]:
+        """
+        Gets the tracked percentile latency of the successful completions of a join phase.
+        :param phase: Join phase.
+        :return: The percentile latency, in seconds, or none if too few latencies have been recorded.
+        """
+
+        with self.__lock:
+            latencies = self.__sorted.get(phase, [])
+
+            if len(latencies) < Latency.__SAMPLES_MINIMUM:
+                return None
+
+            return latencies[max(ceil(self.__percentile * len(latencies)) - 1, 0)]
+
+    def record(self, phase: str, latency: float) -> None:
+        """
+        Record the latency of a completed join phase.
+        :param phase: Join phase.
+        :param latency: Amount of time, in seconds, that the phase took.
+        """
+
+        with self.__lock:
+            recent = self.__recent.setdefault(phase, deque())
+            latencies = self.__sorted.setdefault(phase, [])
+
+            if len(recent) == Latency.__SAMPLES_MAXIMUM:
+                latencies.remove(recent.popleft())
+
+            recent.append(latency)
+            insort(latencies, latency)
+            self.__outcomes.setdefault(phase, deque(maxlen=Latency.__SAMPLES_MAXIMUM)).append(False)
+
+    def timeout(self, phase: str) -> float:
+        """
+        Gets the wait deadline of a join phase.
+        Until enough latencies have been recorded, the initial deadline is used.
+        The deadline is widened by one step if the phase often times out while successes come close to the deadline.
+        :param phase: Join phase.
+        :return: The wait deadline, in seconds.
+        """
+
+        latency = self.percentile(phase)
+        deadline = self.__initial if latency is None else latency * self.__factor
+        deadline = min(max(deadline, self.__floor), self.__ceiling)
+
+        if latency is None:
+            return deadline
+
+        with self.__lock:
+            timeouts = sum(self.__outcomes[phase])
+            outcomes = len(self.__outcomes[phase])
+            slowest = self.__sorted[phase][-1]
+
+        if timeouts <= Latency.__WIDEN_RATE * outcomes or slowest < Latency.__WIDEN_PROXIMITY * deadline:
+            return deadline
+
+        return min(deadline * Latency.__WIDEN_STEP, self.__ceiling)
+
+    # endregion
+
+    # region Constants
+
+    __DEFAULT_CEILING = 30.0
+    """
+    Default longest wait deadline, in seconds.
+    """
+
+    __DEFAULT_FACTOR = 2.0
+    """
+    Default multiple of the percentile latency allowed before a wait fails.
+    """
+
+    __DEFAULT_FLOOR = 2.0
+    """
+    Default shortest wait deadline, in seconds.
+    """
+
+    __DEFAULT_INITIAL = 10.0
+    """
+    Default wait deadline, in seconds, until enough latencies are recorded.
+    """
+
+    __DEFAULT_PERCENTILE = 0.95
+    """
+    Default percentile, as a fraction, from which deadlines are derived.
+    """
+
+    __SAMPLES_MAXIMUM = 200
+    """
+    Number of most recent latencies tracked per join phase.
+    """
+
+    __SAMPLES_MINIMUM = 5
+    """
+    Number of latencies required per join phase before deadlines are derived from them.
+    """
+
+    __WIDEN_PROXIMITY = 0.75
+    """
+    Fraction of the deadline that the slowest recent success must reach before timeouts widen it.
+    """
+
+    __WIDEN_RATE = 0.05
+    """
+    Fraction of recent outcomes that must be timeouts before the deadline is widened.
+    """
+
+    __WIDEN_STEP = 1.5
+    """
+    Multiple by which a deadline is widened, which is applied at most once.
+    """
+
+    # endregion
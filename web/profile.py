@@ -0,0 +1,163 @@
+########################################################################################################################
+# Jackbox Audience Maker > Web > Profile
+# Version 2024.08.04
+########################################################################################################################
+# Copyright (c) 2024 Orobas
+# https://www.orobas.com.au
+
+
+from .stage import Stage
+from typing import List
+
+
+class Profile:
+    """
+    Load profile made of ramp, hold and drain stages.
+    """
+
+    # region Constructors
+
+    def __init__(self, stages: List[Stage]) -> None:
+        """
+        Create a new load profile.
+        :param stages: Stages to run in order.
+        :raises ValueError: If there are no stages.
+        """
+
+        if not stages:
+            raise ValueError("No stages provided.")
+
+        self.__stages = list(stages)
+
+    # endregion
+
+    # region Properties
+
+    @property
+    def stages(self) -> List[Stage]:
+        """
+        Gets the stages to run in order.
+        :return: The stages to run in order.
+        """
+
+        return self.__stages
+
+    # endregion
+
+    # region Methods
+
+    @staticmethod
+    def parse(schedule: str) -> "Profile":
+        """
+        Parse a load profile from its schedule notation.
+        Stages are separated by commas and written as ramp:target:step:interval, hold:duration[:interval]
+        or drain:target:step:interval, for example ramp:300:10:5,hold:60,drain:0:10:5.
+        :param schedule: Schedule notation.
+        :return: The load profile.
+        :raises ValueError: If the schedule notation is not valid.
+        """
+
+        stages = []
+
+        for entry in schedule.split(Profile.__SEPARATOR_STAGE):
+            fields = [field.strip() for field in entry.strip().split(Profile.__SEPARATOR_FIELD)]
+            kind = fields[0].lower()
+
+            if kind == Stage.KIND_HOLD and len(fields) in (2, 3):
+                settings = {"interval": float(fields[2])} if len(fields) == 3 else {}
+                stages.append(Stage(kind, duration=float(fields[1]), **settings))
+            elif kind in (Stage.KIND_DRAIN, Stage.KIND_RAMP) and len(fields) == 4:
+                stages.append(Stage(kind, target=int(fields[1]), step=int(fields[2]), interval=float(fields[3])))
+            else:
+                raise ValueError(f"Stage '{entry.strip()}' is not valid.")
+
+        return Profile(stages)
+
+    def report(self) -> str:
+        """
+        Gets a report of the results of each stage.
+        :return: The report of the results of each stage.
+        """
+
+        lines = []
+        breakdown = None
+        previous = None
+
+        for number, stage in enumerate(self.__stages, start=1):
+            lines.append(f"Stage {number}: {stage}")
+            lines.append(f"  Viewers: {stage.viewers}")
+            lines.append(f"  Joins: {stage.joins}, Failures: {stage.failures} ({stage.failure_rate:.1%})")
+
+            if stage.joins:
+                lines.append(
+                    f"  Latency: p50 {stage.percentile(0.5):.2f}s, " +
+                    f"p95 {stage.percentile(0.95):.2f}s, " +
+                    f"max {stage.percentile(1.0):.2f}s"
+                )
+
+                for label, count in stage.histogram():
+                    lines.append(f"    {label.rjust(Profile.__LABEL_WIDTH)} {count}")
+
+            if stage.load is not None:
+                lines.append(f"  Peak Load: {stage.load:.2f}")
+
+            if stage.memory is not None:
+                lines.append(f"  Lowest Available Memory: {stage.memory / Profile.__MEGABYTE:.0f} MB")
+
+            if stage.broken:
+                lines.append("  Abandoned: no viewers could join")
+
+            latency = stage.percentile(0.95)
+            degraded = latency is not None and previous is not None and latency > previous * Profile.__LATENCY_THRESHOLD
+
+            if degraded:
+                lines.append(f"  Degraded: p95 latency rose {latency / previous:.1f}x over the previous stage")
+
+            if breakdown is None and (stage.broken or stage.failure_rate > Profile.__FAILURE_THRESHOLD or degraded):
+                breakdown = (number, stage.viewers)
+
+            if latency is not None:
+                previous = latency
+
+        if breakdown:
+            lines.append(f"Scaling broke down in stage {breakdown[0]} at {breakdown[1]} viewers.")
+        else:
+            lines.append("Scaling held for every stage.")
+
+        return "\n".join(lines)
+
+    # endregion
+
+    # region Constants
+
+    __FAILURE_THRESHOLD = 0.05
+    """
+    Fraction of failed join attempts above which a stage is considered to have broken down.
+    """
+
+    __LABEL_WIDTH = 8
+    """
+    Width of the histogram bucket labels in the report.
+    """
+
+    __LATENCY_THRESHOLD = 3.0
+    """
+    Multiple of the previous stage's p95 join latency above which a stage is considered to have broken down.
+    """
+
+    __MEGABYTE = 1024 * 1024
+    """
+    Number of bytes in a megabyte.
+    """
+
+    __SEPARATOR_FIELD = ":"
+    """
+    Separator between the fields of a stage.
+    """
+
+    __SEPARATOR_STAGE = ","
+    """
+    Separator between stages.
+    """
+
+    # endregion
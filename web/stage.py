@@ -0,0 +1,292 @@
+########################################################################################################################
+# Jackbox Audience Maker > Web > Stage
+# Version 2024.08.04
+########################################################################################################################
+# Copyright (c) 2024 Orobas
+# https://www.orobas.com.au
+
+
+from math import ceil
+from system.host import Host
+from typing import List, Optional, Tuple
+
+
+class Stage:
+    """
+    Load profile stage.
+    """
+
+    # region Constructors
+
+    def __init__(self, kind: str, **kwargs: float) -> None:
+        """
+        Create a new load profile stage.
+        :param kind: Stage kind, one of ramp, hold or drain.
+        :param kwargs: Keyword arguments.
+        :keyword target: int, Number of audience viewers at the end of a ramp or drain, defaults to zero.
+        :keyword step: int, Number of audience viewers added or removed per interval, defaults to one.
+        :keyword interval: float, Amount of time, in seconds, between steps or samples, defaults to one.
+        :keyword duration: float, Amount of time, in seconds, that a hold lasts, defaults to zero.
+        :raises ValueError: If the kind or any of the settings are not valid.
+        """
+
+        if kind not in (Stage.KIND_DRAIN, Stage.KIND_HOLD, Stage.KIND_RAMP):
+            raise ValueError(f"Stage kind '{kind}' is not valid.")
+
+        self.__kind = kind
+        self.__target = int(kwargs.get("target", 0))
+        self.__step = int(kwargs.get("step", 1))
+        self.__interval = float(kwargs.get("interval", Stage.__DEFAULT_INTERVAL))
+        self.__duration = float(kwargs.get("duration", 0.0))
+
+        if self.__target < 0 or self.__step < 1 or self.__interval < 0 or self.__duration < 0:
+            raise ValueError("Stage settings are not valid.")
+
+        if kind == Stage.KIND_HOLD and self.__interval == 0:
+            raise ValueError("Hold interval is not positive.")
+
+        self.__broken = False
+        self.__failures = 0
+        self.__latencies = []
+        self.__loads = []
+        self.__memories = []
+        self.__viewers = 0
+
+    # endregion
+
+    # region Properties
+
+    @property
+    def broken(self) -> bool:
+        """
+        Determines whether the stage was abandoned because no audience viewers could join.
+        :return: True if the stage was abandoned; otherwise, false.
+        """
+
+        return self.__broken
+
+    @property
+    def duration(self) -> float:
+        """
+        Gets the amount of time, in seconds, that a hold lasts.
+        :return: The amount of time, in seconds, that a hold lasts.
+        """
+
+        return self.__duration
+
+    @property
+    def failure_rate(self) -> float:
+        """
+        Gets the fraction of join attempts that failed.
+        :return: The fraction of join attempts that failed.
+        """
+
+        attempts = self.__failures + len(self.__latencies)
+        return self.__failures / attempts if attempts else 0.0
+
+    @property
+    def failures(self) -> int:
+        """
+        Gets the number of join attempts that failed.
+        :return: The number of join attempts that failed.
+        """
+
+        return self.__failures
+
+    @property
+    def interval(self) -> float:
+        """
+        Gets the amount of time, in seconds, between steps or samples.
+        :return: The amount of time, in seconds, between steps or samples.
+        """
+
+        return self.__interval
+
+    @property
+    def joins(self) -> int:
+        """
+        Gets the number of join attempts that succeeded.
+        :return: The number of join attempts that succeeded.
+        """
+
+        return len(self.__latencies)
+
+    @property
+    def kind(self) -> str:
+        """
+        Gets the stage kind.
+        :return: The stage kind.
+        """
+
+        return self.__kind
+
+    @property
+    def load(self) -> Optional[float]:
+        """
+        Gets the highest host load average sampled during the stage.
+        :return: The highest host load average, or none if it was not sampled.
+        """
+
+        return max(self.__loads) if self.__loads else None
+
+    @property
+    def memory(self) -> Optional[int]:
+        """
+        Gets the lowest amount of available host memory sampled during the stage.
+        :return: The lowest amount of available host memory, in bytes, or none if it was not sampled.
+        """
+
+        return min(self.__memories) if self.__memories else None
+
+    @property
+    def step(self) -> int:
+        """
+        Gets the number of audience viewers added or removed per interval.
+        :return: The number of audience viewers added or removed per interval.
+        """
+
+        return self.__step
+
+    @property
+    def target(self) -> int:
+        """
+        Gets the number of audience viewers at the end of a ramp or drain.
+        :return: The number of audience viewers at the end of a ramp or drain.
+        """
+
+        return self.__target
+
+    @property
+    def viewers(self) -> int:
+        """
+        Gets the number of audience viewers joined when the stage was last sampled.
+        :return: The number of audience viewers joined when the stage was last sampled.
+        """
+
+        return self.__viewers
+
+    # endregion
+
+    # region Methods
+
+    def abandon(self) -> None:
+        """
+        Mark the stage as abandoned.
+        """
+
+        self.__broken = True
+
+    def fail(self) -> None:
+        """
+        Record a failed join attempt.
+        """
+
+        self.__failures += 1
+
+    def histogram(self) -> List[Tuple[str, int]]:
+        """
+        Gets the join latency histogram.
+        :return: List of bucket label and count pairs.
+        """
+
+        counts = [0] * (len(Stage.__HISTOGRAM_BUCKETS) + 1)
+
+        for latency in self.__latencies:
+            index = 0
+
+            while index < len(Stage.__HISTOGRAM_BUCKETS) and latency > Stage.__HISTOGRAM_BUCKETS[index]:
+                index += 1
+
+            counts[index] += 1
+
+        labels = [f"<= {bucket:g}s" for bucket in Stage.__HISTOGRAM_BUCKETS]
+        labels.append(f"> {Stage.__HISTOGRAM_BUCKETS[-1]:g}s")
+        return list(zip(labels, counts))
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """
+        Gets a join latency percentile.
+        :param fraction: Percentile as a fraction between zero and one.
+        :return: The join latency, in seconds, at the percentile, or none if there were no joins.
+        :raises ValueError: If the fraction is not between zero and one.
+        """
+
+        if not 0 <= fraction <= 1:
+            raise ValueError("Fraction is not between zero and one.")
+
+        if not self.__latencies:
+            return None
+
+        latencies = sorted(self.__latencies)
+        return latencies[max(ceil(fraction * len(latencies)) - 1, 0)]
+
+    def record(self, latency: float) -> None:
+        """
+        Record a successful join attempt.
+        :param latency: Amount of time, in seconds, that the join took.
+        """
+
+        self.__latencies.append(latency)
+
+    def sample(self, host: Host, viewers: int) -> None:
+        """
+        Sample the host resource usage.
+        :param host: Host to sample.
+        :param viewers: Number of audience viewers currently joined.
+        """
+
+        load = host.load
+        memory = host.memory_available
+
+        if load is not None:
+            self.__loads.append(load)
+
+        if memory is not None:
+            self.__memories.append(memory)
+
+        self.__viewers = viewers
+
+    def __str__(self) -> str:
+        """
+        Gets the stage in its schedule notation.
+        :return: The stage in its schedule notation.
+        """
+
+        if self.__kind == Stage.KIND_HOLD and self.__interval == Stage.__DEFAULT_INTERVAL:
+            return f"{self.__kind}:{self.__duration:g}"
+
+        if self.__kind == Stage.KIND_HOLD:
+            return f"{self.__kind}:{self.__duration:g}:{self.__interval:g}"
+
+        return f"{self.__kind}:{self.__target}:{self.__step}:{self.__interval:g}"
+
+    # endregion
+
+    # region Constants
+
+    KIND_DRAIN = "drain"
+    """
+    Stage kind that removes audience viewers down to a target.
+    """
+
+    KIND_HOLD = "hold"
+    """
+    Stage kind that keeps the audience viewers for a duration.
+    """
+
+    KIND_RAMP = "ramp"
+    """
+    Stage kind that adds audience viewers up to a target.
+    """
+
+    __DEFAULT_INTERVAL = 1.0
+    """
+    Default amount of time, in seconds, between steps or samples.
+    """
+
+    __HISTOGRAM_BUCKETS = (1.0, 2.0, 5.0, 10.0, 20.0, 30.0, 60.0)
+    """
+    Upper bounds, in seconds, of the join latency histogram buckets.
+    """
+
+    # endregion
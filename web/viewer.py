@@ -1,19 +1,28 @@
 ########################################################################################################################
 # Jackbox Audience Maker > Web > Viewer
-# Version 2024.08.03
+# Version 2024.08.04
 ########################################################################################################################
 # Copyright (c) 2024 Orobas
 # https://www.orobas.com.au
 
 
+from .latency import Latency
+from asyncio import to_thread as async_to_thread
+from json import dumps as json_dumps
 from os import remove as os_remove
 from os.path import dirname as path_directory, expanduser as path_expand, join as path_join, realpath as path_real
 from platform import system as platform_system
-from selenium.common.exceptions import TimeoutException
+from selenium.common.exceptions import TimeoutException, WebDriverException
 from selenium.webdriver import Chrome as ChromeDriver, ChromeOptions, ChromeService
 from selenium.webdriver.common.by import By as FindBy
+from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.support import expected_conditions as expect
 from selenium.webdriver.support.ui import WebDriverWait
+from system.host import Host
+from threading import Lock
+from time import monotonic
+from typing import Any, Callable, Iterable, Optional
+from urllib.parse import urlsplit
 from uuid import uuid4
 
 
@@ -24,11 +33,31 @@ class Viewer:
 
     # region Globals
 
+    __cpus = None
+    """
+    Processors on which the browser and driver processes may run.
+    """
+
+    __lock = Lock()
+    """
+    Lock that guards the creation of the shared Chrome driver options and service across joining threads.
+    """
+
     __options = None
     """
     Chrome driver options.
     """
 
+    __priority = None
+    """
+    Niceness applied to the browser and driver processes.
+    """
+
+    __renderers = None
+    """
+    Maximum number of renderer processes per browser instance.
+    """
+
     __service = None
     """
     Chrome driver service.
@@ -38,12 +67,27 @@ class Viewer:
 
     # region Constructors
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        url: str = None,
+        listener: Optional[Callable[[str, int], None]] = None,
+        latency: Optional[Latency] = None
+    ) -> None:
         """
         Create a new audience viewer.
+        :param url: URL to the webpage for joining a game, defaults to the Jackbox website.
+        :param listener: Callable that receives a status and the change in its count, from any thread, defaults to none.
+        :param latency: Join latency tracker that sets the wait deadlines, defaults to a fixed deadline.
         """
 
         self.__browser = None
+        self.__joined = False
+        self.__latency = latency
+        self.__listener = listener
+        self.__name = None
+        self.__parked = False
+        self.__script = None
+        self.__url = url or Viewer.__JOIN_URL
 
     # endregion
 
@@ -86,11 +130,24 @@ class Viewer:
         """
 
         if not self.__browser:
-            self.__browser = ChromeDriver(self.__options__, self.__service__)
+            with Viewer.__lock:
+                options = self.__options__
+                service = self.__service__
+
+            self.__browser = ChromeDriver(options, service)
             self.__browser.set_window_size(720, 576)
 
         return self.__browser
 
+    @property
+    def name(self) -> Optional[str]:
+        """
+        Gets the name with which the viewer joined the game.
+        :return: The name with which the viewer joined the game, or none if it has not joined.
+        """
+
+        return self.__name
+
     @property
     def __options__(self) -> ChromeOptions:
         """
@@ -106,6 +163,9 @@ class Viewer:
             if Viewer.__RUN_HEADLESS:
                 Viewer.__options.add_argument(Viewer.__OPTION_HEADLESS)
 
+            if Viewer.__renderers:
+                Viewer.__options.add_argument(f"{Viewer.__OPTION_RENDERERS}{Viewer.__renderers}")
+
         return Viewer.__options
 
     @property
@@ -135,6 +195,27 @@ class Viewer:
 
         return platform_system() == Viewer.__OS_WINDOWS
 
+    @property
+    def parked(self) -> bool:
+        """
+        Determines whether the viewer has been parked.
+        :return: True if the viewer has been parked; otherwise, false.
+        """
+
+        return self.__parked
+
+    @property
+    def pid_driver(self) -> Optional[int]:
+        """
+        Gets the process identifier of the driver shared by all browser instances.
+        :return: The process identifier of the driver, or none if it has not been started.
+        """
+
+        if not Viewer.__service or not Viewer.__service.process:
+            return None
+
+        return Viewer.__service.process.pid
+
     # noinspection DuplicatedCode
     @property
     def path_browser(self) -> str:
@@ -180,11 +261,25 @@ class Viewer:
         """
         Gets the browser service.
         :return: The browser service.
+        :raises RuntimeError: If the configured process isolation could not be applied.
         """
 
         if not Viewer.__service:
-            Viewer.__service = ChromeService(executable_path=self.path_driver)
-            Viewer.__service.start()
+            service = ChromeService(executable_path=self.path_driver)
+            service.start()
+
+            if Viewer.__cpus or Viewer.__priority is not None:
+                try:
+                    count = Host().isolate(service.process.pid, Viewer.__cpus, Viewer.__priority)
+                except OSError as error:
+                    service.stop()
+                    raise RuntimeError(f"Browser processes could not be isolated: {error}")
+
+                if count == 0:
+                    service.stop()
+                    raise RuntimeError("Browser processes could not be isolated.")
+
+            Viewer.__service = service
 
         return Viewer.__service
 
@@ -194,48 +289,349 @@ class Viewer:
 
     def close(self) -> None:
         """
-        Close the browser instance.
+        Close the browser instance, if one has been created.
+        """
+
+        if self.__browser:
+            self.__browser.close()
+
+        if self.__joined:
+            self.__joined = False
+            self.__notify__(Viewer.STATUS_JOINED, -1)
+
+    def __connect__(self, room: str, state: Optional[dict]) -> bool:
+        """
+        Join a game, or rejoin it with the identity of an earlier snapshot, blocking until done.
+        :param room: Room code.
+        :param state: Snapshot of an earlier viewer to restore.
+        :return: True if the game was joined; otherwise, false.
+        """
+
+        started = monotonic()
+        name = state[Viewer.__STATE_NAME] if state else uuid4().hex
+        file = path_join(self.__bin__, f"{name}{Viewer.__JOIN_EXTENSION}")
+
+        try:
+            if state:
+                self.__restore__(state)
+
+            self.__load__(started)
+
+            if state and self.__resume__(started):
+                self.__joined = True
+                self.__name = name
+                return True
+
+            self.__populate__(self.__wait__(Viewer.__JOIN_ROOM, started), room, state is not None)
+            self.__populate__(self.__wait__(Viewer.__JOIN_NAME), name, state is not None)
+
+            attempts = Viewer.__JOIN_ATTEMPTS
+
+            while attempts > 0:
+                if Viewer.__RUN_DEBUGGING:
+                    self.__browser__.save_screenshot(file)
+
+                try:
+                    self.__wait__(Viewer.__JOIN_BUTTON).click()
+
+                    if Viewer.__RUN_DEBUGGING:
+                        os_remove(file)
+
+                    self.__joined = True
+                    self.__name = name
+                    return True
+                except TimeoutException:
+                    attempts -= 1
+
+                    if attempts > 0:
+                        self.__notify__(Viewer.STATUS_RETRIED)
+        except (RuntimeError, WebDriverException):
+            pass
+
+        return False
+
+    @staticmethod
+    def isolate(
+        cpus: Optional[Iterable[int]] = None,
+        priority: Optional[int] = None,
+        renderers: Optional[int] = None
+    ) -> None:
+        """
+        Configure the process isolation of all browser instances, before any of them have been created.
+        Processor and priority restrictions only apply on Linux, and start the browser service straight away.
+        :param cpus: Processors on which the browser and driver processes may run, defaults to no restriction.
+        :param priority: Niceness applied to the browser and driver processes, defaults to no change.
+        :param renderers: Maximum number of renderer processes per browser instance, defaults to no limit.
+        :raises RuntimeError: If a browser instance has already been created or the isolation could not be applied.
+        :raises ValueError: If the processors, priority or renderer limit are not valid or cannot be applied.
         """
 
-        self.__browser__.close()
+        if Viewer.__options or Viewer.__service:
+            raise RuntimeError("Browser instances have already been created.")
+
+        host = Host()
+
+        if (cpus or priority is not None) and not host.isolation:
+            raise ValueError("Processor and priority isolation is only supported on Linux.")
+
+        if cpus and not set(cpus) <= host.processors:
+            raise ValueError(f"Processors are not available, choose from {sorted(host.processors)}.")
+
+        if priority is not None and not host.priority <= priority <= Viewer.__PRIORITY_MAXIMUM:
+            raise ValueError(f"Priority is not a niceness from {host.priority} to {Viewer.__PRIORITY_MAXIMUM}.")
+
+        if renderers is not None and renderers < 1:
+            raise ValueError("Renderer limit is not a positive integer.")
+
+        Viewer.__cpus = set(cpus) if cpus else None
+        Viewer.__priority = priority
+        Viewer.__renderers = renderers
+
+        if Viewer.__cpus or Viewer.__priority is not None:
+            try:
+                _ = Viewer().__service__
+            except (RuntimeError, WebDriverException) as error:
+                Viewer.__cpus = None
+                Viewer.__priority = None
+
+                if isinstance(error, RuntimeError):
+                    raise
 
-    async def join(self, room: str) -> "Viewer":
+                raise RuntimeError(f"Browser service could not be started: {error.msg}") from error
+
+    async def join(self, room: str, state: Optional[dict] = None) -> "Viewer":
         """
-        Join a game.
+        Join a game, or rejoin it with the identity of an earlier snapshot.
+        The blocking browser work runs in a worker thread so that several viewers can join at once.
         :param room: Room code.
+        :param state: Snapshot of an earlier viewer to restore, defaults to none.
         :return: This instance.
         :throws RuntimeError: If the game could not be joined.
         """
 
-        self.__browser__.get(Viewer.__JOIN_URL)
+        self.__notify__(Viewer.STATUS_PENDING)
 
-        name = uuid4().hex
-        file = path_join(self.__bin__, f"{name}{Viewer.__JOIN_EXTENSION}")
-        wait = WebDriverWait(self.__browser__, Viewer.__JOIN_WAIT)
+        try:
+            joined = await async_to_thread(self.__connect__, room, state)
+        finally:
+            self.__notify__(Viewer.STATUS_PENDING, -1)
+
+        if not joined:
+            self.__notify__(Viewer.STATUS_FAILED)
+            raise RuntimeError("Game could not be joined.")
+
+        self.__notify__(Viewer.STATUS_JOINED)
+        return self
+
+    def __load__(self, started: float) -> None:
+        """
+        Load the webpage for joining a game, within the room phase deadline when a join latency tracker is used.
+        :param started: Monotonic time at which the room phase started.
+        :raises TimeoutException: If the webpage did not load before the deadline.
+        """
+
+        if not self.__latency:
+            self.__browser__.get(self.__url)
+            return
+
+        timeout = self.__latency.timeout(Viewer.__JOIN_ROOM) - (monotonic() - started)
+        self.__browser__.set_page_load_timeout(max(timeout, 0.0))
 
         try:
-            wait.until(expect.element_to_be_clickable((FindBy.ID, Viewer.__JOIN_ROOM))).send_keys(room)
-            wait.until(expect.element_to_be_clickable((FindBy.ID, Viewer.__JOIN_NAME))).send_keys(name)
+            self.__browser__.get(self.__url)
         except TimeoutException:
-            raise RuntimeError("Game could not be joined.")
+            self.__latency.expire(Viewer.__JOIN_ROOM)
+            raise
 
-        attempts = Viewer.__JOIN_ATTEMPTS
+    def __notify__(self, status: str, delta: int = 1) -> None:
+        """
+        Notify the listener of a change in status.
+        :param status: Status.
+        :param delta: Change in the count of the status.
+        """
 
-        while attempts > 0:
-            if Viewer.__RUN_DEBUGGING:
-                self.__browser__.save_screenshot(file)
+        if self.__listener:
+            self.__listener(status, delta)
 
-            try:
-                wait.until(expect.element_to_be_clickable((FindBy.ID, Viewer.__JOIN_BUTTON))).click()
+    def park(self) -> "Viewer":
+        """
+        Trim memory and throttle rendering of a joined browser instance while keeping it connected.
+        :return: This instance.
+        """
 
-                if Viewer.__RUN_DEBUGGING:
-                    os_remove(file)
+        if self.__parked:
+            return self
+
+        browser = self.__browser__
+        browser.execute_cdp_cmd("HeapProfiler.collectGarbage", {})
+        browser.execute_cdp_cmd("Memory.simulatePressureNotification", {"level": Viewer.__PARK_PRESSURE})
+        browser.execute_cdp_cmd("Network.clearBrowserCache", {})
+        browser.execute_cdp_cmd("Emulation.setCPUThrottlingRate", {"rate": Viewer.__PARK_THROTTLING})
+        browser.execute_cdp_cmd("Animation.setPlaybackRate", {"playbackRate": 0})
+        browser.execute_cdp_cmd("Emulation.setDeviceMetricsOverride", {
+            "width": Viewer.__PARK_VIEWPORT,
+            "height": Viewer.__PARK_VIEWPORT,
+            "deviceScaleFactor": 1,
+            "mobile": False,
+        })
+
+        self.__parked = True
+        return self
+
+    # noinspection PyMethodMayBeStatic
+    def __populate__(self, element: WebElement, value: str, restoring: bool) -> None:
+        """
+        Enter a value into an HTML element, leaving it untouched if a restored page already holds the value.
+        :param element: HTML element.
+        :param value: Value to enter.
+        :param restoring: True if the page was restored from a snapshot; otherwise, false.
+        """
+
+        if restoring:
+            if element.get_attribute("value") == value:
+                return
+
+            element.clear()
+
+        element.send_keys(value)
+
+    @staticmethod
+    def restorable(state: Any) -> bool:
+        """
+        Determines whether a snapshot holds everything needed to restore a viewer.
+        :param state: Snapshot of an earlier viewer.
+        :return: True if the snapshot can be restored; otherwise, false.
+        """
+
+        if not isinstance(state, dict) or not isinstance(state.get(Viewer.__STATE_NAME), str):
+            return False
+
+        cookies = state.get(Viewer.__STATE_COOKIES, [])
+
+        if not isinstance(cookies, list):
+            return False
+
+        for cookie in cookies:
+            if not isinstance(cookie, dict):
+                return False
+
+            if not isinstance(cookie.get(Viewer.__COOKIE_NAME), str):
+                return False
+
+            if not isinstance(cookie.get(Viewer.__COOKIE_VALUE), str):
+                return False
+
+        for key in (Viewer.__STATE_LOCAL, Viewer.__STATE_SESSION):
+            storage = state.get(key, {})
+
+            if not isinstance(storage, dict) or not all(isinstance(value, str) for value in storage.values()):
+                return False
+
+        return True
 
-                return self
-            except TimeoutException:
-                attempts -= 1
+    def __restore__(self, state: dict) -> None:
+        """
+        Stage the cookies and storage of a snapshot so that they are in place when the webpage is next loaded.
+        :param state: Snapshot of an earlier viewer.
+        """
+
+        browser = self.__browser__
+        cookies = []
+
+        for cookie in state.get(Viewer.__STATE_COOKIES, []):
+            cookie = dict(cookie)
+
+            if Viewer.__COOKIE_EXPIRY in cookie:
+                cookie[Viewer.__COOKIE_EXPIRES] = cookie.pop(Viewer.__COOKIE_EXPIRY)
+
+            cookies.append(cookie)
+
+        if cookies:
+            browser.execute_cdp_cmd("Network.setCookies", {"cookies": cookies})
+
+        address = urlsplit(self.__url)
+        script = Viewer.__SCRIPT_RESTORE % (
+            json_dumps(f"{address.scheme}://{address.netloc}"),
+            json_dumps(state.get(Viewer.__STATE_LOCAL, {})),
+            json_dumps(state.get(Viewer.__STATE_SESSION, {}))
+        )
+
+        response = browser.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": script})
+        self.__script = response.get("identifier")
+
+    def __resume__(self, started: float) -> bool:
+        """
+        Determine whether a restored webpage reconnected to the game by itself.
+        The game is considered reconnected once the page shows content without the join form for two polls in a row.
+        :param started: Monotonic time at which the room phase started.
+        :return: True if the webpage reconnected to the game; otherwise, false.
+        """
+
+        browser = self.__browser__
 
-        raise RuntimeError("Game could not be joined.")
+        if self.__script:
+            browser.execute_cdp_cmd("Page.removeScriptToEvaluateOnNewDocument", {"identifier": self.__script})
+            self.__script = None
+
+        timeout = self.__latency.timeout(Viewer.__JOIN_ROOM) if self.__latency else Viewer.__JOIN_WAIT
+        previous = [None]
+
+        def settled(driver: ChromeDriver) -> Optional[str]:
+            current = driver.execute_script(Viewer.__SCRIPT_PROBE, Viewer.__JOIN_ROOM, Viewer.__JOIN_BUTTON)
+            stable = current == previous[0]
+            previous[0] = current
+            return current if current == Viewer.__PROBE_FORM or (current == Viewer.__PROBE_GAME and stable) else None
+
+        try:
+            state = WebDriverWait(browser, max(timeout - (monotonic() - started), 0.0)).until(settled)
+        except TimeoutException:
+            return False
+
+        return state == Viewer.__PROBE_GAME
+
+    def snapshot(self) -> dict:
+        """
+        Gets a snapshot of the viewer's name, cookies and storage for rejoining the game later.
+        :return: The snapshot.
+        :raises RuntimeError: If the viewer has not joined a game.
+        """
+
+        if not self.__joined:
+            raise RuntimeError("Viewer has not joined a game.")
+
+        return {
+            Viewer.__STATE_NAME: self.__name,
+            Viewer.__STATE_COOKIES: self.__browser__.get_cookies(),
+            Viewer.__STATE_LOCAL: self.__browser__.execute_script(Viewer.__SCRIPT_LOCAL),
+            Viewer.__STATE_SESSION: self.__browser__.execute_script(Viewer.__SCRIPT_SESSION),
+        }
+
+    def __wait__(self, identifier: str, started: Optional[float] = None) -> WebElement:
+        """
+        Wait for an HTML element to become clickable, recording how long it took.
+        A wait that reaches its deadline is recorded as a timeout rather than as a latency.
+        :param identifier: Identifier of the HTML element, which is also used as the join phase.
+        :param started: Monotonic time at which the phase started, defaults to now.
+        :return: The HTML element.
+        :raises TimeoutException: If the HTML element did not become clickable before the deadline.
+        """
+
+        if not self.__latency:
+            wait = WebDriverWait(self.__browser__, Viewer.__JOIN_WAIT)
+            return wait.until(expect.element_to_be_clickable((FindBy.ID, identifier)))
+
+        started = monotonic() if started is None else started
+        timeout = self.__latency.timeout(identifier) - (monotonic() - started)
+        wait = WebDriverWait(self.__browser__, max(timeout, 0.0))
+
+        try:
+            element = wait.until(expect.element_to_be_clickable((FindBy.ID, identifier)))
+        except TimeoutException:
+            self.__latency.expire(identifier)
+            raise
+
+        self.__latency.record(identifier, monotonic() - started)
+        return element
 
     # endregion
 
@@ -271,6 +667,26 @@ class Viewer:
     Browser file for the Windows operating system.
     """
 
+    __COOKIE_EXPIRES = "expires"
+    """
+    Key of the cookie expiry time in DevTools cookie parameters.
+    """
+
+    __COOKIE_EXPIRY = "expiry"
+    """
+    Key of the cookie expiry time in driver cookies.
+    """
+
+    __COOKIE_NAME = "name"
+    """
+    Key of the cookie name in driver cookies.
+    """
+
+    __COOKIE_VALUE = "value"
+    """
+    Key of the cookie value in driver cookies.
+    """
+
     __DRIVER_LINUX_DIRECTORY = "chromedriver-linux64"
     """
     Driver directory for the Linux operating system.
@@ -333,7 +749,7 @@ class Viewer:
 
     __JOIN_WAIT = 10.0
     """
-    Amount of time, in seconds, to wait before clicking the button to join the game.
+    Amount of time, in seconds, to wait for each element when no join latency tracker is used.
     """
 
     __OPTION_AGENT_LINUX = "--user-agent=" +\
@@ -365,6 +781,11 @@ class Viewer:
     Hides the browser's interface.
     """
 
+    __OPTION_RENDERERS = "--renderer-process-limit="
+    """
+    Limits the number of renderer processes.
+    """
+
     __OS_LINUX = "Linux"
     """
     Linux operating system identifier.
@@ -380,6 +801,36 @@ class Viewer:
     Windows operating system identifier.
     """
 
+    __PARK_PRESSURE = "critical"
+    """
+    Memory pressure level signalled to a parked browser so that it releases its caches.
+    """
+
+    __PARK_THROTTLING = 4
+    """
+    CPU slowdown factor applied to a parked browser.
+    """
+
+    __PARK_VIEWPORT = 64
+    """
+    Width and height, in pixels, of the viewport rendered by a parked browser.
+    """
+
+    __PRIORITY_MAXIMUM = 19
+    """
+    Highest niceness, which is the lowest scheduling priority.
+    """
+
+    __PROBE_FORM = "form"
+    """
+    Probe result when the page shows the join form.
+    """
+
+    __PROBE_GAME = "game"
+    """
+    Probe result when the page shows content other than the join form.
+    """
+
     __RUN_DEBUGGING = False
     """
     True to save a screenshot if the browser if the game cannot be loaded.
@@ -390,4 +841,70 @@ class Viewer:
     True to run in headless mode; otherwise, false.
     """
 
+    __SCRIPT_LOCAL = "return Object.assign({}, window.localStorage);"
+    """
+    Script that returns the contents of the page's local storage.
+    """
+
+    __SCRIPT_PROBE = "if (document.readyState !== 'complete') return null;" +\
+                     "if (document.getElementById(arguments[0])) return 'form';" +\
+                     "if (document.getElementById(arguments[1])) return 'form';" +\
+                     "return document.body && document.body.innerText.trim() ? 'game' : null;"
+    """
+    Script that reports whether the page shows the join form or other content.
+    """
+
+    __SCRIPT_RESTORE = "if (location.origin === %s) {" +\
+                       "for (const [key, value] of Object.entries(%s)) localStorage.setItem(key, value);" +\
+                       "for (const [key, value] of Object.entries(%s)) sessionStorage.setItem(key, value);" +\
+                       "}"
+    """
+    Script template that restores the contents of the page's local and session storage before the page runs.
+    """
+
+    __SCRIPT_SESSION = "return Object.assign({}, window.sessionStorage);"
+    """
+    Script that returns the contents of the page's session storage.
+    """
+
+    __STATE_COOKIES = "cookies"
+    """
+    Snapshot key of the browser cookies.
+    """
+
+    __STATE_LOCAL = "local"
+    """
+    Snapshot key of the page's local storage.
+    """
+
+    __STATE_NAME = "name"
+    """
+    Snapshot key of the viewer's name.
+    """
+
+    __STATE_SESSION = "session"
+    """
+    Snapshot key of the page's session storage.
+    """
+
+    STATUS_FAILED = "failed"
+    """
+    Status of audience viewers that could not join the game.
+    """
+
+    STATUS_JOINED = "joined"
+    """
+    Status of audience viewers that have joined the game.
+    """
+
+    STATUS_PENDING = "pending"
+    """
+    Status of audience viewers that are joining the game.
+    """
+
+    STATUS_RETRIED = "retried"
+    """
+    Status of join attempts that timed out and were retried.
+    """
+
     # endregion
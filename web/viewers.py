@@ -1,13 +1,23 @@
 ########################################################################################################################
 # Jackbox Audience Maker > Web > Viewers
-# Version 2024.08.02
+# Version 2024.08.04
 ########################################################################################################################
 # Copyright (c) 2024 Orobas
 # https://www.orobas.com.au
 
 
+from .latency import Latency
+from .profile import Profile
+from .stage import Stage
 from .viewer import Viewer
-from asyncio import create_task as async_create, gather as async_gather
+from asyncio import Task, create_task as async_create, gather as async_gather, sleep as async_sleep
+from json import dump as json_dump, load as json_load
+from os import replace as os_replace
+from selenium.common.exceptions import WebDriverException
+from system.host import Host
+from threading import Event, Thread
+from time import monotonic
+from typing import Any, Callable, List, Optional
 
 
 class Viewers:
@@ -17,24 +27,82 @@ class Viewers:
 
     # region Constructors
 
-    def __init__(self) -> None:
+    def __init__(self, listener: Optional[Callable[[str, int], None]] = None, **kwargs: Any) -> None:
         """
         Create new audience viewers.
+        :param listener: Callable that receives a viewer status and the change in its count, defaults to none.
+        :param kwargs: Keyword arguments.
+        :keyword floor: float, Shortest join wait deadline, in seconds, defaults to two seconds.
+        :keyword ceiling: float, Longest join wait deadline, in seconds, defaults to thirty seconds.
+        :keyword replacements: int, Number of failed viewers replaced during a build, defaults to the count.
+        :raises ValueError: If the floor or ceiling are not valid.
         """
 
+        latency = {key: kwargs[key] for key in ("floor", "ceiling") if kwargs.get(key) is not None}
+
+        self.__latency = Latency(**latency)
+        self.__listener = listener
+        self.__replacements = kwargs.get("replacements", None)
+        self.__room = None
+        self.__saving = None
         self.__tasks = []
+        self.__url = None
+
+    # endregion
+
+    # region Properties
+
+    @property
+    def __viewers__(self) -> list:
+        """
+        Gets the audience viewers that have joined the game.
+        :return: The audience viewers that have joined the game.
+        """
+
+        return [task.result() for task in self.__tasks if task.done() and not task.cancelled() and not task.exception()]
 
     # endregion
 
     # region Methods
 
-    async def build(self, room: str, count: int) -> "Viewers":
+    def autosave(self, path: str, interval: float = 60.0) -> None:
+        """
+        Save a session snapshot now and then periodically in the background until the viewers are closed.
+        The viewers must not be used from elsewhere while a background save could be running.
+        :param path: Path to the session snapshot file.
+        :param interval: Amount of time, in seconds, between saves.
+        :raises RuntimeError: If no game has been joined or snapshots are already being saved.
+        :raises ValueError: If the interval is not positive.
+        """
+
+        if self.__saving:
+            raise RuntimeError("Snapshots are already being saved.")
+
+        if interval <= 0:
+            raise ValueError("Interval is not positive.")
+
+        self.save(path)
+        stop = Event()
+
+        def save() -> None:
+            while not stop.wait(interval):
+                try:
+                    self.save(path)
+                except (OSError, RuntimeError):
+                    continue
+
+        thread = Thread(target=save, daemon=True)
+        thread.start()
+        self.__saving = (stop, thread)
+
+    async def build(self, room: str, count: int, url: str = None) -> "Viewers":
         """
         Build the audience viewers.
         :param room: Room code.
         :param count: Number of audience viewers.
+        :param url: URL to the webpage for joining a game, defaults to the Jackbox website.
         :returns: This instance.
-        :raises RuntimeError: If the existing viewers have not been closed.
+        :raises RuntimeError: If the existing viewers have not been closed or too many could not join the game.
         :raises ValueError: If the count is not a positive integer.
         """
 
@@ -44,10 +112,9 @@ class Viewers:
         if count < 1:
             raise ValueError("Count is not a positive integer.")
 
-        for _ in range(count):
-            self.__tasks.append(async_create(Viewer().join(room)))
-
-        await async_gather(*self.__tasks)
+        self.__room = room
+        self.__url = url
+        await self.__gather__([async_create(self.__join__(room, url)) for _ in range(count)])
         return self
 
     def close(self) -> None:
@@ -55,6 +122,11 @@ class Viewers:
         Close all browser instances.
         """
 
+        if self.__saving:
+            self.__saving[0].set()
+            self.__saving[1].join()
+            self.__saving = None
+
         for task in self.__tasks:
             if task.done():
                 task.result().close()
@@ -62,5 +134,270 @@ class Viewers:
                 task.cancel()
 
         self.__tasks.clear()
+        self.__room = None
+        self.__url = None
+
+    async def __gather__(self, tasks: List[Task]) -> None:
+        """
+        Wait for joining audience viewers, replacing those that fail with new ones.
+        :param tasks: Tasks of the joining audience viewers.
+        :raises RuntimeError: If too many audience viewers could not join the game.
+        """
+
+        replacements = len(tasks) if self.__replacements is None else self.__replacements
+
+        while tasks:
+            await async_gather(*tasks, return_exceptions=True)
+            self.__tasks.extend(task for task in tasks if not task.exception())
+            failures = sum(1 for task in tasks if task.exception())
+
+            if failures > replacements:
+                raise RuntimeError("Game could not be joined.")
+
+            replacements -= failures
+            tasks = [async_create(self.__join__(self.__room, self.__url)) for _ in range(failures)]
+
+    async def __join__(
+        self,
+        room: str,
+        url: str,
+        stage: Optional[Stage] = None,
+        state: Optional[dict] = None
+    ) -> Viewer:
+        """
+        Join a game with a new audience viewer, closing it if the game could not be joined.
+        :param room: Room code.
+        :param url: URL to the webpage for joining a game.
+        :param stage: Load profile stage against which the outcome is recorded, defaults to none.
+        :param state: Snapshot of an earlier audience viewer to restore, defaults to none.
+        :return: The audience viewer.
+        :raises RuntimeError: If the game could not be joined.
+        """
+
+        viewer = Viewer(url, self.__listener, self.__latency)
+        started = monotonic()
+
+        try:
+            await viewer.join(room, state)
+        except (RuntimeError, WebDriverException) as error:
+            if stage:
+                stage.fail()
+
+            try:
+                viewer.close()
+            except WebDriverException:
+                pass
+
+            raise RuntimeError("Game could not be joined.") from error
+
+        if stage:
+            stage.record(monotonic() - started)
+
+        return viewer
+
+    @staticmethod
+    def load(path: str) -> Optional[dict]:
+        """
+        Load a session snapshot.
+        :param path: Path to the session snapshot file.
+        :return: The session snapshot, or none if the file does not exist or is not a valid snapshot.
+        """
+
+        try:
+            with open(path) as file:
+                session = json_load(file)
+        except (OSError, ValueError):
+            return None
+
+        if not isinstance(session, dict) or not isinstance(session.get(Viewers.SESSION_VIEWERS), list):
+            return None
+
+        if not isinstance(session.get(Viewers.SESSION_ROOM), str):
+            return None
+
+        states = [state for state in session[Viewers.SESSION_VIEWERS] if Viewer.restorable(state)]
+        session[Viewers.SESSION_VIEWERS] = states
+        return session if states else None
+
+    async def measure(self, duration: float = 5.0) -> Optional[dict]:
+        """
+        Measure the steady-state resource usage of the browser and driver process tree on Linux.
+        :param duration: Amount of time, in seconds, over which CPU usage is sampled.
+        :return: Dictionary with the resident memory in megabytes and the CPU usage in cores, or none if not available.
+        :raises ValueError: If the duration is not positive.
+        """
+
+        if duration <= 0:
+            raise ValueError("Duration is not positive.")
+
+        viewers = self.__viewers__
+        pid = viewers[0].pid_driver if viewers else None
+
+        if pid is None:
+            return None
+
+        host = Host()
+        before = host.resources(pid)
+        started = monotonic()
+        await async_sleep(duration)
+        after = host.resources(pid)
+        elapsed = monotonic() - started
+
+        if before is None or after is None:
+            return None
+
+        return {
+            "rss": after[0] / Viewers.__MEGABYTE,
+            "cpu": max(after[1] - before[1], 0.0) / elapsed,
+        }
+
+    def park(self) -> "Viewers":
+        """
+        Park all joined audience viewers to trim their memory and throttle their rendering.
+        :return: This instance.
+        """
+
+        for viewer in self.__viewers__:
+            viewer.park()
+
+        return self
+
+    async def profile(self, room: str, profile: Profile, url: str = None) -> Profile:
+        """
+        Run a load profile against a game, recording the results of each stage.
+        :param room: Room code.
+        :param profile: Load profile to run.
+        :param url: URL to the webpage for joining a game, defaults to the Jackbox website.
+        :return: The load profile with the results recorded.
+        :raises RuntimeError: If the existing viewers have not been closed.
+        """
+
+        if self.__tasks:
+            raise RuntimeError("Existing viewers have not been closed.")
+
+        self.__room = room
+        self.__url = url
+        host = Host()
+
+        for stage in profile.stages:
+            stage.sample(host, len(self.__tasks))
+
+            if stage.kind == Stage.KIND_HOLD:
+                end = monotonic() + stage.duration
+
+                while monotonic() < end:
+                    await async_sleep(min(stage.interval, max(end - monotonic(), 0.0)))
+                    stage.sample(host, len(self.__tasks))
+
+                continue
+
+            while stage.kind == Stage.KIND_RAMP and len(self.__tasks) < stage.target:
+                count = min(stage.step, stage.target - len(self.__tasks))
+                started = monotonic()
+                tasks = [async_create(self.__join__(room, url, stage)) for _ in range(count)]
+                await async_gather(*tasks, return_exceptions=True)
+                joined = [task for task in tasks if not task.exception()]
+                self.__tasks.extend(joined)
+                stage.sample(host, len(self.__tasks))
+
+                if not joined:
+                    stage.abandon()
+                    return profile
+
+                await async_sleep(max(stage.interval - (monotonic() - started), 0.0))
+
+            while stage.kind == Stage.KIND_DRAIN and len(self.__tasks) > stage.target:
+                for _ in range(min(stage.step, len(self.__tasks) - stage.target)):
+                    try:
+                        self.__tasks.pop().result().close()
+                    except WebDriverException:
+                        stage.fail()
+
+                stage.sample(host, len(self.__tasks))
+                await async_sleep(stage.interval)
+
+        return profile
+
+    async def restore(self, session: dict) -> "Viewers":
+        """
+        Rejoin a game with the audience viewers of a session snapshot.
+        Audience viewers that cannot be restored are replaced with new ones.
+        :param session: Session snapshot.
+        :return: This instance.
+        :raises RuntimeError: If the existing viewers have not been closed or too many could not join the game.
+        """
+
+        if self.__tasks:
+            raise RuntimeError("Existing viewers have not been closed.")
+
+        self.__room = session[Viewers.SESSION_ROOM]
+        self.__url = session.get(Viewers.__SESSION_URL)
+
+        await self.__gather__([
+            async_create(self.__join__(self.__room, self.__url, state=state))
+            for state in session[Viewers.SESSION_VIEWERS]
+        ])
+
+        return self
+
+    def save(self, path: str) -> None:
+        """
+        Save a session snapshot of the joined audience viewers, skipping any whose browser no longer responds.
+        :param path: Path to the session snapshot file.
+        :raises RuntimeError: If no game has been joined.
+        """
+
+        if not self.__room:
+            raise RuntimeError("No game has been joined.")
+
+        states = []
+
+        for viewer in self.__viewers__:
+            try:
+                states.append(viewer.snapshot())
+            except (RuntimeError, WebDriverException):
+                continue
+
+        session = {
+            Viewers.SESSION_ROOM: self.__room,
+            Viewers.__SESSION_URL: self.__url,
+            Viewers.SESSION_VIEWERS: states,
+        }
+
+        temporary = f"{path}{Viewers.__SESSION_TEMPORARY}"
+
+        with open(temporary, "w") as file:
+            json_dump(session, file, separators=(",", ":"))
+
+        os_replace(temporary, path)
+
+    # endregion
+
+    # region Constants
+
+    __MEGABYTE = 1024 * 1024
+    """
+    Number of bytes in a megabyte.
+    """
+
+    __SESSION_TEMPORARY = ".tmp"
+    """
+    Suffix of the file to which a session snapshot is written before it replaces the previous one.
+    """
+
+    __SESSION_URL = "url"
+    """
+    Session snapshot key of the URL to the webpage for joining a game.
+    """
+
+    SESSION_ROOM = "room"
+    """
+    Session snapshot key of the room code.
+    """
+
+    SESSION_VIEWERS = "viewers"
+    """
+    Session snapshot key of the audience viewer snapshots.
+    """
 
     # endregion